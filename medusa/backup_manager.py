@@ -14,7 +14,6 @@
 # limitations under the License.
 
 
-import asyncio
 import logging
 import threading
 
@@ -116,6 +115,34 @@ class BackupMan:
             BackupMan.__instance.__backups[backup_name] = [None, BackupMan.STATUS_UNKNOWN, is_async]
             logging.info("Registered backup id {}".format(backup_name))
 
+    # Reserves a backup name before any work gets submitted for it.
+    # An entry whose future is still running is left alone and False is returned,
+    # so callers can reject the duplicate without starting work that would have
+    # to be discarded. Stale entries (no future, or an already completed one)
+    # are replaced like register_backup does.
+    @staticmethod
+    def reserve_backup(backup_name, is_async):
+        if not backup_name:
+            raise RuntimeError(BackupMan.NO_BACKUP_NAME_ERR_MSG)
+
+        lock = threading.Lock()
+        with lock:
+            if not BackupMan.__instance:
+                BackupMan()
+
+            existing = BackupMan.__instance.__backups.get(backup_name)
+            if existing is not None:
+                existing_future = existing[BackupMan.__IDX_FUTURE]
+                if existing_future is not None and not existing_future.done():
+                    logging.info("Backup name {} is already in progress, not reserving it again.".format(backup_name))
+                    return False
+                if not BackupMan.__clean(backup_name):
+                    logging.error("Reserved backup name {} cleanup failed prior to re-reserve.".format(backup_name))
+
+            BackupMan.__instance.__backups[backup_name] = [None, BackupMan.STATUS_UNKNOWN, is_async]
+            logging.info("Reserved backup id {}".format(backup_name))
+            return True
+
     # Caller can decide how long to wait for a result using the registered backup future returned.
     # A future is returned (for async mode), otherwise None (for non-async mode).
     # Exception thrown when expected backup not located.
@@ -194,9 +221,11 @@ class BackupMan:
         try:
             backup_future = BackupMan.__instance.__backups[backup_name][0]
             logging.debug("Cancelling backup` id: {}".format(backup_name))
-            if backup_future is not None and asyncio.isfuture(backup_future):
-                backup_future.cancel("Removal of backup requested. Cancelling backup Name: {} with "
-                                     "done state: {}".format(backup_name, backup_future.done()))
+            if backup_future is not None:
+                # asyncio and concurrent.futures futures both expose cancel(),
+                # so no need for a per-call isfuture type check that would skip
+                # cancellation of futures submitted straight to an executor
+                backup_future.cancel()
             del BackupMan.__instance.__backups[backup_name]
         except Exception as e:
             logging.error("Failed removal of backup for Name: {} due to "
@@ -240,20 +240,21 @@ def backups_to_purge_by_name(storage, cluster_backups, backup_names_to_purge, al
     return backups_to_purge
 
 
-def delete_backup(config, backup_names, all_nodes):
+def delete_backup(config, backup_names, all_nodes, storage=None):
     monitoring = Monitoring(config=config.monitoring)
 
     try:
-        with Storage(config=config.storage) as storage:
-            cluster_backups = storage.list_cluster_backups()
-            backups_to_purge = backups_to_purge_by_name(storage, cluster_backups, backup_names, all_nodes)
-
-            logging.info('Deleting Backup(s) {}...'.format(",".join(backup_names)))
-            purge_backups(storage, backups_to_purge, config.storage.backup_grace_period_in_days, storage.config.fqdn)
+        # a storage can be provided by callers which maintain a long-lived
+        # connection (like the gRPC service), to avoid re-opening one per call
+        if storage is None:
+            with Storage(config=config.storage) as connected_storage:
+                delete_backup_w_storage(config, backup_names, all_nodes, connected_storage)
+        else:
+            delete_backup_w_storage(config, backup_names, all_nodes, storage)
 
-            logging.debug('Emitting metrics')
-            tags = ['medusa-node-backup', 'delete-error', 'DELETE-ERROR']
-            monitoring.send(tags, 0)
+        logging.debug('Emitting metrics')
+        tags = ['medusa-node-backup', 'delete-error', 'DELETE-ERROR']
+        monitoring.send(tags, 0)
     except Exception as e:
         tags = ['medusa-node-backup', 'delete-error', 'DELETE-ERROR']
         monitoring.send(tags, 1)
@@ -262,3 +263,11 @@ def delete_backup(config, backup_names, all_nodes):
             'This error happened during the delete of backup(s) "{}": {}'.format(",".join(backup_names), str(e)),
             config
         )
+
+
+def delete_backup_w_storage(config, backup_names, all_nodes, storage):
+    cluster_backups = storage.list_cluster_backups()
+    backups_to_purge = backups_to_purge_by_name(storage, cluster_backups, backup_names, all_nodes)
+
+    logging.info('Deleting Backup(s) {}...'.format(",".join(backup_names)))
+    purge_backups(storage, backups_to_purge, config.storage.backup_grace_period_in_days, storage.config.fqdn)
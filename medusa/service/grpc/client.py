@@ -91,6 +91,15 @@ class Client:
             logging.error("Failed to obtain list of backups due to error: {}".format(e))
             return None
 
+    async def get_backups_stream(self):
+        try:
+            stub = medusa_pb2_grpc.MedusaStub(self.channel)
+            request = medusa_pb2.GetBackupsRequest()
+            async for summary in stub.GetBackupsStream(request):
+                yield summary
+        except grpc.RpcError as e:
+            logging.error("Failed to stream list of backups due to error: {}".format(e))
+
     async def get_backup_status(self, name):
         try:
             stub = medusa_pb2_grpc.MedusaStub(self.channel)
@@ -44,6 +44,11 @@ class MedusaStub(object):
                 request_serializer=medusa__pb2.GetBackupsRequest.SerializeToString,
                 response_deserializer=medusa__pb2.GetBackupsResponse.FromString,
                 )
+        self.GetBackupsStream = channel.unary_stream(
+                '/Medusa/GetBackupsStream',
+                request_serializer=medusa__pb2.GetBackupsRequest.SerializeToString,
+                response_deserializer=medusa__pb2.BackupSummary.FromString,
+                )
         self.PurgeBackups = channel.unary_unary(
                 '/Medusa/PurgeBackups',
                 request_serializer=medusa__pb2.PurgeBackupsRequest.SerializeToString,
@@ -95,6 +100,12 @@ class MedusaServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def GetBackupsStream(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
     def PurgeBackups(self, request, context):
         """Missing associated documentation comment in .proto file."""
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
@@ -140,6 +151,11 @@ def add_MedusaServicer_to_server(servicer, server):
                     request_deserializer=medusa__pb2.GetBackupsRequest.FromString,
                     response_serializer=medusa__pb2.GetBackupsResponse.SerializeToString,
             ),
+            'GetBackupsStream': grpc.unary_stream_rpc_method_handler(
+                    servicer.GetBackupsStream,
+                    request_deserializer=medusa__pb2.GetBackupsRequest.FromString,
+                    response_serializer=medusa__pb2.BackupSummary.SerializeToString,
+            ),
             'PurgeBackups': grpc.unary_unary_rpc_method_handler(
                     servicer.PurgeBackups,
                     request_deserializer=medusa__pb2.PurgeBackupsRequest.FromString,
@@ -262,6 +278,23 @@ class Medusa(object):
             options, channel_credentials,
             insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
 
+    @staticmethod
+    def GetBackupsStream(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(request, target, '/Medusa/GetBackupsStream',
+            medusa__pb2.GetBackupsRequest.SerializeToString,
+            medusa__pb2.BackupSummary.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
     @staticmethod
     def PurgeBackups(request,
             target,
@@ -13,11 +13,20 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import os
+
+# Select the C++/upb protobuf backend before google.protobuf gets imported.
+# The pure-Python fallback is orders of magnitude slower at building the
+# BackupSummary/BackupNode messages returned by the service.
+os.environ.setdefault("PROTOCOL_BUFFERS_PYTHON_IMPLEMENTATION", "upb")
+
 import asyncio
 import json
 import logging
-import os
+import signal
 import sys
+import threading
+import time
 from collections import defaultdict
 from concurrent import futures
 from concurrent.futures.thread import ThreadPoolExecutor
@@ -46,28 +55,66 @@ BACKUP_MODE_FULL = "full"
 RESTORE_MAPPING_LOCATION = "/var/lib/cassandra/.restore_mapping"
 RESTORE_MAPPING_ENV = "RESTORE_MAPPING"
 
+# TTLs for memoized cluster backup lookups. Operators tend to poll the backup
+# state about once per second per client, so a short TTL collapses concurrent
+# identical reads against the object storage into a single one. A finished
+# backup is stable, so it can be kept around for longer.
+CLUSTER_BACKUP_TTL_SECONDS = 1.0
+FINISHED_CLUSTER_BACKUP_TTL_SECONDS = 60.0
+
+# Shared pool for async backups. Creating a ThreadPoolExecutor per RPC spawns
+# OS threads on every call and leaks them, as the per-call executor was never
+# shut down. The pool is created lazily and re-created after a shutdown, so a
+# Server stopped and restarted within the same process (as the integration
+# harness does) doesn't end up submitting to a dead executor.
+_backup_pool = None
+_backup_pool_lock = threading.Lock()
+
+
+def backup_pool():
+    global _backup_pool
+    with _backup_pool_lock:
+        if _backup_pool is None:
+            _backup_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="medusa-backup")
+        return _backup_pool
+
+
+def shutdown_backup_pool():
+    global _backup_pool
+    with _backup_pool_lock:
+        if _backup_pool is not None:
+            _backup_pool.shutdown(wait=False)
+            _backup_pool = None
+
 
 class Server:
     def __init__(self, config_file_path, testing=False):
         self.config_file_path = config_file_path
+        self._parsed_config = None
         self.medusa_config = self.create_config()
         self.testing = testing
         self.grpc_server = aio.server(futures.ThreadPoolExecutor(max_workers=10), options=[
             ('grpc.max_send_message_length', self.medusa_config.grpc.max_send_message_length),
-            ('grpc.max_receive_message_length', self.medusa_config.grpc.max_receive_message_length)
+            ('grpc.max_receive_message_length', self.medusa_config.grpc.max_receive_message_length),
+            # let several server processes share port 50051 and balance accepts
+            ('grpc.so_reuseport', 1),
+            # keep idle client connections alive so status polls don't pay a
+            # reconnect; gRPC already disables Nagle (TCP_NODELAY) by default
+            ('grpc.keepalive_time_ms', 30000),
+            ('grpc.http2.min_time_between_pings_ms', 10000),
         ])
         logging.info("GRPC server initialized")
 
-    def shutdown(self, signum, frame):
+    async def shutdown(self):
         logging.info("Shutting down GRPC server")
         handle_backup_removal_all()
-        asyncio.get_event_loop().run_until_complete(self.grpc_server.stop(0))
+        shutdown_backup_pool()
+        await self.grpc_server.stop(0)
 
     async def serve(self):
-        config = self.create_config()
         self.configure_console_logging()
 
-        medusa_pb2_grpc.add_MedusaServicer_to_server(MedusaService(config), self.grpc_server)
+        medusa_pb2_grpc.add_MedusaServicer_to_server(MedusaService(self.medusa_config), self.grpc_server)
         health_pb2_grpc.add_HealthServicer_to_server(grpc_health.v1.health.HealthServicer(), self.grpc_server)
 
         logging.info('Starting server. Listening on port 50051.')
@@ -75,6 +122,9 @@ class Server:
         await self.grpc_server.start()
 
         if not self.testing:
+            loop = asyncio.get_running_loop()
+            for sig in (signal.SIGINT, signal.SIGTERM):
+                loop.add_signal_handler(sig, lambda: asyncio.ensure_future(self.shutdown()))
             try:
                 await self.grpc_server.wait_for_termination()
             except asyncio.exceptions.CancelledError:
@@ -82,10 +132,13 @@ class Server:
             handle_backup_removal_all()
 
     def create_config(self):
-        config_file = Path(self.config_file_path)
-        args = defaultdict(lambda: None)
+        # the config file is static for the process lifetime, parse it once
+        if self._parsed_config is None:
+            config_file = Path(self.config_file_path)
+            args = defaultdict(lambda: None)
+            self._parsed_config = load_config(args, config_file)
 
-        return load_config(args, config_file)
+        return self._parsed_config
 
     def configure_console_logging(self):
         root_logger = logging.getLogger('')
@@ -114,10 +167,36 @@ class MedusaService(medusa_pb2_grpc.MedusaServicer):
         logging.info("Init service")
         self.config = config
         self.storage_config = config.storage
+        self.storage = None
+        self.storage_lock = threading.Lock()
+        self.cluster_backup_cache = {}
+        self.cluster_backup_cache_lock = threading.Lock()
+
+    def connected_storage(self):
+        # Lazily build a single Storage and keep its backend connection open, so
+        # RPCs reuse the pooled client instead of re-opening sessions per call.
+        with self.storage_lock:
+            if self.storage is None:
+                storage = Storage(config=self.storage_config)
+                storage.storage_driver.connect()
+                self.storage = storage
+        return self.storage
+
+    def get_cluster_backup_cached(self, backup_name):
+        now = time.monotonic()
+        with self.cluster_backup_cache_lock:
+            entry = self.cluster_backup_cache.get(backup_name)
+            if entry is not None and entry[0] > now:
+                return entry[1]
+        backup = self.connected_storage().get_cluster_backup(backup_name)
+        ttl = FINISHED_CLUSTER_BACKUP_TTL_SECONDS if backup.finished else CLUSTER_BACKUP_TTL_SECONDS
+        with self.cluster_backup_cache_lock:
+            self.cluster_backup_cache[backup_name] = (now + ttl, backup)
+        return backup
 
     async def AsyncBackup(self, request, context):
         # TODO pass the staggered arg
-        logging.info("Performing ASYNC backup {} (type={})".format(request.name, request.mode))
+        logging.info("Performing ASYNC backup %s (type=%s)", request.name, request.mode)
         response = medusa_pb2.BackupResponse()
         mode = BACKUP_MODE_DIFFERENTIAL
         if medusa_pb2.BackupRequest.Mode.FULL == request.mode:
@@ -126,11 +205,15 @@ class MedusaService(medusa_pb2_grpc.MedusaServicer):
         try:
             response.backupName = request.name
             response.status = response.status = medusa_pb2.StatusType.IN_PROGRESS
-            BackupMan.register_backup(request.name, is_async=True)
-            executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix=request.name)
+            # reserve the name before submitting anything, so a duplicate
+            # request doesn't kick off a second backup that would be discarded
+            if not BackupMan.reserve_backup(request.name, is_async=True):
+                context.set_details("Backup {} is already in progress".format(request.name))
+                context.set_code(grpc.StatusCode.ALREADY_EXISTS)
+                return response
             loop = asyncio.get_running_loop()
             backup_future = loop.run_in_executor(
-                executor,
+                backup_pool(),
                 backup_node.handle_backup,
                 self.config, request.name, None, False, mode
             )
@@ -145,13 +228,17 @@ class MedusaService(medusa_pb2_grpc.MedusaServicer):
 
             context.set_details("Failed to create async backup: {}".format(e))
             context.set_code(grpc.StatusCode.INTERNAL)
-            logging.exception("Async backup failed due to error: {}".format(e))
+            logging.exception("Async backup failed due to error: %s", e)
 
         return response
 
-    def Backup(self, request, context):
+    async def Backup(self, request, context):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._backup, request, context)
+
+    def _backup(self, request, context):
         # TODO pass the staggered arg
-        logging.info("Performing SYNC backup {} (type={})".format(request.name, request.mode))
+        logging.info("Performing SYNC backup %s (type=%s)", request.name, request.mode)
         response = medusa_pb2.BackupResponse()
         mode = BACKUP_MODE_DIFFERENTIAL
         if medusa_pb2.BackupRequest.Mode.FULL == request.mode:
@@ -171,33 +258,37 @@ class MedusaService(medusa_pb2_grpc.MedusaServicer):
 
             context.set_details("Failed to create sync backups: {}".format(e))
             context.set_code(grpc.StatusCode.INTERNAL)
-            logging.exception("Sync backup failed due to error: {}".format(e))
+            logging.exception("Sync backup failed due to error: %s", e)
 
         return response
 
-    def BackupStatus(self, request, context):
+    async def BackupStatus(self, request, context):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._backup_status, request, context)
+
+    def _backup_status(self, request, context):
         response = medusa_pb2.BackupStatusResponse()
         try:
-            with Storage(config=self.storage_config) as storage:
-                # find the backup
-                backup = storage.get_node_backup(fqdn=storage.config.fqdn, name=request.backupName)
-                if backup.started is None:
-                    raise KeyError
-                # work out the timings
-                response.startTime = datetime.fromtimestamp(backup.started).strftime(TIMESTAMP_FORMAT)
-                if backup.finished:
-                    response.finishTime = datetime.fromtimestamp(backup.finished).strftime(TIMESTAMP_FORMAT)
-                else:
-                    response.finishTime = ""
-                BackupMan.register_backup(request.backupName, is_async=False)
-                status = BackupMan.STATUS_UNKNOWN
-                if backup.started:
-                    status = BackupMan.STATUS_IN_PROGRESS
-                if backup.finished:
-                    status = BackupMan.STATUS_SUCCESS
-                BackupMan.update_backup_status(request.backupName, status)
-                # record the status
-                record_status_in_response(response, request.backupName)
+            storage = self.connected_storage()
+            # find the backup
+            backup = storage.get_node_backup(fqdn=storage.config.fqdn, name=request.backupName)
+            if backup.started is None:
+                raise KeyError
+            # work out the timings
+            response.startTime = format_timestamp(backup.started)
+            if backup.finished:
+                response.finishTime = format_timestamp(backup.finished)
+            else:
+                response.finishTime = ""
+            BackupMan.register_backup(request.backupName, is_async=False)
+            status = BackupMan.STATUS_UNKNOWN
+            if backup.started:
+                status = BackupMan.STATUS_IN_PROGRESS
+            if backup.finished:
+                status = BackupMan.STATUS_SUCCESS
+            BackupMan.update_backup_status(request.backupName, status)
+            # record the status
+            record_status_in_response(response, request.backupName)
         except KeyError:
             context.set_details("backup <{}> does not exist".format(request.backupName))
             context.set_code(grpc.StatusCode.NOT_FOUND)
@@ -205,14 +296,17 @@ class MedusaService(medusa_pb2_grpc.MedusaServicer):
 
         return response
 
-    def GetBackup(self, request, context):
+    async def GetBackup(self, request, context):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._get_backup, request, context)
+
+    def _get_backup(self, request, context):
         response = medusa_pb2.GetBackupResponse()
         try:
-            with Storage(config=self.storage_config) as connected_storage:
-                backup = connected_storage.get_cluster_backup(request.backupName)
-                summary = get_backup_summary(backup)
-                response.backup.CopyFrom(summary)
-                response.status = summary.status
+            backup = self.get_cluster_backup_cached(request.backupName)
+            summary = get_backup_summary(backup)
+            response.backup.CopyFrom(summary)
+            response.status = summary.status
         except Exception as e:
             context.set_details("Failed to get backup due to error: {}".format(e))
             context.set_code(grpc.StatusCode.INTERNAL)
@@ -220,16 +314,20 @@ class MedusaService(medusa_pb2_grpc.MedusaServicer):
             response.backup.status = medusa_pb2.StatusType.UNKNOWN
         return response
 
-    def GetBackups(self, request, context):
+    async def GetBackups(self, request, context):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._get_backups, request, context)
+
+    def _get_backups(self, request, context):
         response = medusa_pb2.GetBackupsResponse()
         try:
             # cluster backups
-            with Storage(config=self.storage_config) as connected_storage:
-                backups = get_backups(connected_storage, self.config, True)
-                for backup in backups:
-                    summary = get_backup_summary(backup)
-                    response.backups.append(summary)
-                set_overall_status(response)
+            connected_storage = self.connected_storage()
+            backups = get_backups(connected_storage, self.config, True)
+            # bulk-extend the repeated field so each summary is not appended
+            # (and copied) through a separate protobuf call
+            response.backups.extend(get_backup_summary(backup) for backup in backups)
+            set_overall_status(response)
 
         except Exception as e:
             context.set_details("Failed to get backups due to error: {}".format(e))
@@ -237,22 +335,47 @@ class MedusaService(medusa_pb2_grpc.MedusaServicer):
             response.status = medusa_pb2.StatusType.UNKNOWN
         return response
 
-    def DeleteBackup(self, request, context):
-        logging.info("Deleting backup {}".format(request.name))
+    async def GetBackupsStream(self, request, context):
+        # Streams one summary per backup, so listing a cluster with a large
+        # backup history neither materializes nor serializes the whole backup
+        # list in a single response, and clients can consume it as it arrives.
+        loop = asyncio.get_running_loop()
+        try:
+            backups = await loop.run_in_executor(
+                None, lambda: list(get_backups(self.connected_storage(), self.config, True)))
+        except Exception as e:
+            context.set_details("Failed to get backups due to error: {}".format(e))
+            context.set_code(grpc.StatusCode.INTERNAL)
+            return
+        for backup in backups:
+            yield await loop.run_in_executor(None, get_backup_summary, backup)
+
+    async def DeleteBackup(self, request, context):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._delete_backup, request, context)
+
+    def _delete_backup(self, request, context):
+        logging.info("Deleting backup %s", request.name)
         response = medusa_pb2.DeleteBackupResponse()
 
         try:
-            delete_backup(self.config, [request.name], True)
+            delete_backup(self.config, [request.name], True, storage=self.connected_storage())
+            with self.cluster_backup_cache_lock:
+                self.cluster_backup_cache.pop(request.name, None)
             handle_backup_removal(request.name)
         except Exception as e:
             context.set_details("deleting backups failed: {}".format(e))
             context.set_code(grpc.StatusCode.INTERNAL)
-            logging.exception("Deleting backup {} failed".format(request.name))
+            logging.exception("Deleting backup %s failed", request.name)
         return response
 
-    def PurgeBackups(self, request, context):
-        logging.info("Purging backups with max age {} and max count {}"
-                     .format(self.config.storage.max_backup_age, self.config.storage.max_backup_count))
+    async def PurgeBackups(self, request, context):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._purge_backups, request, context)
+
+    def _purge_backups(self, request, context):
+        logging.info("Purging backups with max age %s and max count %s",
+                     self.config.storage.max_backup_age, self.config.storage.max_backup_count)
         response = medusa_pb2.PurgeBackupsResponse()
 
         try:
@@ -271,73 +394,79 @@ class MedusaService(medusa_pb2_grpc.MedusaServicer):
             logging.exception("Purging backups failed")
         return response
 
-    def PrepareRestore(self, request, context):
-        logging.info("Preparing restore {} for backup {}".format(request.restoreKey, request.backupName))
+    async def PrepareRestore(self, request, context):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._prepare_restore, request, context)
+
+    def _prepare_restore(self, request, context):
+        logging.info("Preparing restore %s for backup %s", request.restoreKey, request.backupName)
         response = medusa_pb2.PrepareRestoreResponse()
         try:
-            with Storage(config=self.storage_config) as connected_storage:
-                cluster_backup = connected_storage.get_cluster_backup(request.backupName)
-                restore_job = RestoreJob(cluster_backup,
-                                         self.config, Path("/tmp"),
-                                         None,
-                                         "127.0.0.1",
-                                         True,
-                                         False,
-                                         1,
-                                         bypass_checks=True)
-                restore_job.prepare_restore()
-                os.makedirs(RESTORE_MAPPING_LOCATION, exist_ok=True)
-                with open(f"{RESTORE_MAPPING_LOCATION}/{request.restoreKey}", "w") as f:
-                    f.write(json.dumps({'in_place': restore_job.in_place, 'host_map': restore_job.host_map}))
+            connected_storage = self.connected_storage()
+            cluster_backup = connected_storage.get_cluster_backup(request.backupName)
+            restore_job = RestoreJob(cluster_backup,
+                                     self.config, Path("/tmp"),
+                                     None,
+                                     "127.0.0.1",
+                                     True,
+                                     False,
+                                     1,
+                                     bypass_checks=True)
+            restore_job.prepare_restore()
+            os.makedirs(RESTORE_MAPPING_LOCATION, exist_ok=True)
+            with open(f"{RESTORE_MAPPING_LOCATION}/{request.restoreKey}", "w") as f:
+                f.write(json.dumps({'in_place': restore_job.in_place, 'host_map': restore_job.host_map}))
         except Exception as e:
             context.set_details("Failed to prepare restore: {}".format(e))
             context.set_code(grpc.StatusCode.INTERNAL)
-            logging.exception("Failed restore prep {} for backup {}".format(request.restoreKey, request.backupName))
+            logging.exception("Failed restore prep %s for backup %s", request.restoreKey, request.backupName)
         return response
 
 
+# Renders a timestamp in the same shape as TIMESTAMP_FORMAT, but without going
+# through the locale-aware strftime machinery on every status poll.
+def format_timestamp(timestamp):
+    dt = datetime.fromtimestamp(timestamp)
+    return f"{dt.year:04d}-{dt.month:02d}-{dt.day:02d} {dt.hour:02d}:{dt.minute:02d}:{dt.second:02d}"
+
+
 def set_overall_status(get_backups_response):
     get_backups_response.overallStatus = medusa_pb2.StatusType.UNKNOWN
     backups = get_backups_response.backups
     if len(backups) == 0:
         return
-    if all(backup.status == medusa_pb2.StatusType.SUCCESS for backup in backups):
+    # collect the statuses in a single pass instead of sweeping the whole
+    # backup list once per status type
+    statuses = {backup.status for backup in backups}
+    if statuses == {medusa_pb2.StatusType.SUCCESS}:
         get_backups_response.overallStatus = medusa_pb2.StatusType.SUCCESS
-    if any(backup.status == medusa_pb2.StatusType.IN_PROGRESS for backup in backups):
+    if medusa_pb2.StatusType.IN_PROGRESS in statuses:
         get_backups_response.overallStatus = medusa_pb2.StatusType.IN_PROGRESS
-    if any(backup.status == medusa_pb2.StatusType.FAILED for backup in backups):
+    if medusa_pb2.StatusType.FAILED in statuses:
         get_backups_response.overallStatus = medusa_pb2.StatusType.FAILED
-    if any(backup.status == medusa_pb2.StatusType.UNKNOWN for backup in backups):
+    if medusa_pb2.StatusType.UNKNOWN in statuses:
         get_backups_response.overallStatus = medusa_pb2.StatusType.UNKNOWN
 
 
 def get_backup_summary(backup):
-    summary = medusa_pb2.BackupSummary()
-
-    summary.backupName = backup.name
-
-    if backup.started is None:
-        summary.startTime = 0
-    else:
-        summary.startTime = backup.started
-
-    if backup.finished is None:
-        summary.finishTime = 0
-        summary.status = medusa_pb2.StatusType.IN_PROGRESS
-    else:
-        summary.finishTime = backup.finished
-        summary.status = medusa_pb2.StatusType.SUCCESS
-
-    summary.totalNodes = len(backup.tokenmap)
-    summary.finishedNodes = len(backup.complete_nodes())
-
-    for node in backup.tokenmap:
-        summary.nodes.append(create_token_map_node(backup, node))
-
-    summary.backupType = backup.backup_type
-
-    summary.totalSize = backup.size()
-    summary.totalObjects = backup.num_objects()
+    # started and finished are properties which walk every node backup on each
+    # access (finished also recomputes the missing nodes), so evaluate them once
+    started = backup.started
+    finished = backup.finished
+    # Build the summary with constructor kwargs rather than attribute-by-attribute
+    # assignments, so each field set does not cross the protobuf C boundary.
+    summary = medusa_pb2.BackupSummary(
+        backupName=backup.name,
+        startTime=0 if started is None else started,
+        finishTime=0 if finished is None else finished,
+        status=medusa_pb2.StatusType.IN_PROGRESS if finished is None else medusa_pb2.StatusType.SUCCESS,
+        totalNodes=len(backup.tokenmap),
+        finishedNodes=len(backup.complete_nodes()),
+        backupType=backup.backup_type,
+        totalSize=backup.size(),
+        totalObjects=backup.num_objects(),
+    )
+    summary.nodes.extend(create_token_map_node(backup, node) for node in backup.tokenmap)
 
     return summary
 
@@ -346,11 +475,20 @@ def get_backup_summary(backup):
 def record_backup_info(future):
     try:
         logging.info("Recording async backup information.")
-        if future.exception():
+        # check the future state before touching its outcome: exception() on a
+        # cancelled future raises CancelledError instead of returning it
+        if future.cancelled():
+            logging.info("Backup future was cancelled, nothing to record.")
+            return
+
+        exception = future.exception()
+        if exception:
             logging.error("Failed to record backup information executed in "
-                          "async manner. Error: {}".format(future.exception()))
+                          "async manner. Error: %s", exception)
             return
 
+        # the future is done and exception-free at this point, so result()
+        # cannot block or re-raise here
         result = future.result()
         if not result:
             logging.error("Expected a backup result for recording in callback function.")
@@ -359,22 +497,23 @@ def record_backup_info(future):
         (actual_backup_duration, actual_start, end, node_backup, node_backup_cache, num_files, start,
          backup_name) = result
 
-        logging.info("Setting result in callback for backup Name: {}".format(backup_name))
+        logging.info("Setting result in callback for backup Name: %s", backup_name)
         BackupMan.set_backup_result(backup_name, result)
 
     except Exception as e:
-        logging.error("Failed to record backup information executed in async manner. Error: {}".format(e))
+        logging.error("Failed to record backup information executed in async manner. Error: %s", e)
 
 
 def create_token_map_node(backup, node):
-    token_map_node = medusa_pb2.BackupNode()
-    token_map_node.host = node
-    token_map_node.datacenter = backup.tokenmap[node]["dc"] if "dc" in backup.tokenmap[node] else ""
-    token_map_node.rack = backup.tokenmap[node]["rack"] if "rack" in backup.tokenmap[node] else ""
-    if "tokens" in backup.tokenmap[node]:
-        for token in backup.tokenmap[node]["tokens"]:
-            token_map_node.tokens.append(token)
-    return token_map_node
+    # look up the node's tokenmap entry once instead of re-hashing the key for
+    # every field, which adds up when tokenmaps contain hundreds of nodes
+    meta = backup.tokenmap[node]
+    return medusa_pb2.BackupNode(
+        host=node,
+        datacenter=meta["dc"] if "dc" in meta else "",
+        rack=meta["rack"] if "rack" in meta else "",
+        tokens=meta["tokens"] if "tokens" in meta else (),
+    )
 
 
 # Transform internal status code to gRPC backup status type
@@ -390,7 +529,7 @@ def record_status_in_response(response, backup_name):
 
 def handle_backup_removal(backup_name):
     if not BackupMan.remove_backup(backup_name):
-        logging.error("Failed to cleanup single backup Name: {}".format(backup_name))
+        logging.error("Failed to cleanup single backup Name: %s", backup_name)
 
 
 def handle_backup_removal_all():
@@ -73,6 +73,7 @@ class NodeBackup(object):
         self._cached_blobs = {pathlib.Path(blob.name): blob for blob in preloaded_blobs}
 
         self.cached_manifest = None
+        self.cached_parsed_manifest = None
         self.cached_manifest_blob = manifest_blob
         self.cached_schema_blob = schema_blob
         self.cached_tokenmap_blob = tokenmap_blob
@@ -247,9 +248,19 @@ class NodeBackup(object):
             self.cached_manifest = self._storage.storage_driver.get_blob_content_as_string(self.manifest_path)
         return self.cached_manifest
 
+    # The manifest can be large and json.loads on it is the JSON hot spot of
+    # listing and status calls, so the decoded structure is cached alongside
+    # the raw string.
+    @property
+    def parsed_manifest(self):
+        if self.cached_parsed_manifest is None:
+            self.cached_parsed_manifest = json.loads(self.manifest)
+        return self.cached_parsed_manifest
+
     @manifest.setter
     def manifest(self, manifest):
         self.cached_manifest = None
+        self.cached_parsed_manifest = None
         self._storage.storage_driver.upload_blob_from_string(self.manifest_path, manifest)
 
     def datapath(self, *, keyspace, columnfamily):
@@ -265,12 +276,12 @@ class NodeBackup(object):
     def size(self):
         return sum(
             obj['size']
-            for section in json.loads(self.manifest)
+            for section in self.parsed_manifest
             for obj in section['objects']
         )
 
     def num_objects(self):
         return sum(
             len(section['objects'])
-            for section in json.loads(self.manifest)
+            for section in self.parsed_manifest
         )
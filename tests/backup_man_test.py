@@ -104,6 +104,21 @@ class BackupManTest(unittest.TestCase):
         self.assertNotEqual(BackupMan.get_backup_future(backup_id_1), mock_future_1)
         self.assertEqual(BackupMan.get_backup_future(backup_id_1), mock_future_2)
 
+    def test_reserve_backup_duplicate_in_flight(self):
+        backup_id = "test_backup_id"
+        mock_future = Mock(concurrent.futures.Future)
+        mock_future.done.return_value = False
+        self.assertTrue(BackupMan.reserve_backup(backup_id, is_async=True))
+        BackupMan.set_backup_future(backup_id, mock_future)
+
+        # the backup is still running, a duplicate reservation is refused
+        self.assertFalse(BackupMan.reserve_backup(backup_id, is_async=True))
+
+        # once the future completed, the name can be reserved again
+        mock_future.done.return_value = True
+        self.assertTrue(BackupMan.reserve_backup(backup_id, is_async=True))
+        self.assertIsNone(BackupMan.get_backup_future(backup_id))
+
     def test_backup_man_singleton_check(self):
         backup_id_1 = "test_backup_id"
         mock_future_1 = Mock(concurrent.futures.Future)
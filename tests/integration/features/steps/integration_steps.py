@@ -163,7 +163,7 @@ class GRPCServer:
         asyncio.get_event_loop().run_until_complete(self.grpc_server.serve())
 
     def destroy(self):
-        self.grpc_server.shutdown(None, None)
+        asyncio.get_event_loop().run_until_complete(self.grpc_server.shutdown())
         if os.path.isdir(os.path.join("/tmp", "medusa_grpc")):
             shutil.rmtree(os.path.join("/tmp", "medusa_grpc"))
 
@@ -11,6 +11,7 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import asyncio
 import configparser
 import unittest
 
@@ -65,7 +66,7 @@ class ServerTest(unittest.TestCase):
         # no need to fake a backup here because we're not actually interested in it
         request = medusa_pb2.GetBackupRequest(backupName='unknown_backup')
         context = Mock(spec=ServicerContext)
-        get_backup_response = service.GetBackup(request, context)
+        get_backup_response = asyncio.run(service.GetBackup(request, context))
 
         # assert the fields we get in the response
         response_fields = {field.name for field in get_backup_response.DESCRIPTOR.fields}
@@ -124,7 +125,7 @@ class ServerTest(unittest.TestCase):
                     with patch('medusa.storage.Storage.get_cluster_backup', return_value=cluster_backup):
                         request = medusa_pb2.BackupStatusRequest(backupName='backup1')
                         context = Mock(spec=ServicerContext)
-                        get_backup_response = service.GetBackup(request, context)
+                        get_backup_response = asyncio.run(service.GetBackup(request, context))
 
                         self.assertEqual(medusa_pb2.StatusType.SUCCESS, get_backup_response.status)
 
@@ -146,6 +147,47 @@ class ServerTest(unittest.TestCase):
                         self.assertEqual(medusa_pb2.StatusType.SUCCESS, get_backup_response.backup.status)
                         self.assertEqual('differential', get_backup_response.backup.backupType)
 
+    def test_get_backups_stream(self):
+        # start the Medusa service
+        medusa_config = self._make_config()
+        service = MedusaService(medusa_config)
+
+        # build a fake cluster backup object
+        storage = Storage(config=medusa_config.storage)
+        cluster_backup = make_cluster_backup(
+            storage=storage,
+            name='backup1',
+            backup_date=datetime.fromtimestamp(123456),
+            nodes=['node1'],
+            differential=True
+        )
+        cluster_backup.size = lambda: 0
+        cluster_backup.num_objects = lambda: 0
+        tokenmap_dict = {
+            "node1": {"tokens": [-1094266504216117253], "is_up": True, "rack": "r1", "dc": "dc1"}
+        }
+
+        async def consume_stream():
+            request = medusa_pb2.GetBackupsRequest()
+            context = Mock(spec=ServicerContext)
+            return [summary async for summary in service.GetBackupsStream(request, context)]
+
+        with patch('medusa.storage.ClusterBackup.tokenmap', return_value=tokenmap_dict) as tokenmap:
+            tokenmap.__iter__ = lambda _: list(tokenmap_dict.keys()).__iter__()
+            tokenmap.__len__ = lambda _: len(tokenmap_dict.keys())
+            # we don't ever create any file, so we won't get timestamps from the storage
+            with patch('medusa.storage.ClusterBackup.started', return_value=12345):
+                with patch('medusa.storage.ClusterBackup.finished', return_value=123456):
+                    # prevent calls to the storage by faking the backup listing
+                    with patch('medusa.service.grpc.server.get_backups', return_value=[cluster_backup]):
+                        summaries = asyncio.run(consume_stream())
+
+                        # we get exactly one summary per backup, streamed individually
+                        self.assertEqual(1, len(summaries))
+                        self.assertEqual('backup1', summaries[0].backupName)
+                        self.assertEqual('differential', summaries[0].backupType)
+                        self.assertEqual([medusa_pb2.BackupNode(host='node1')], summaries[0].nodes)
+
     def test_get_backup_status_unknown_backup(self):
         # start the Medusa service
         medusa_config = self._make_config()
@@ -155,7 +197,7 @@ class ServerTest(unittest.TestCase):
         # no need to fake a backup here because we're not actually interested in it
         request = medusa_pb2.BackupStatusRequest(backupName='unknown_backup')
         context = Mock(spec=ServicerContext)
-        backup_status = service.BackupStatus(request, context)
+        backup_status = asyncio.run(service.BackupStatus(request, context))
 
         # verify the response structure without an emphasis on the actual contents
         status_fields = {field.name for field in backup_status.DESCRIPTOR.fields}
@@ -182,7 +224,7 @@ class ServerTest(unittest.TestCase):
         with patch('medusa.storage.Storage.get_node_backup', return_value=node_backup):
             request = medusa_pb2.BackupStatusRequest(backupName='backup1')
             context = Mock(spec=ServicerContext)
-            backup_status = service.BackupStatus(request, context)
+            backup_status = asyncio.run(service.BackupStatus(request, context))
 
             self.assertEqual(medusa_pb2.StatusType.SUCCESS, backup_status.status)
 
@@ -209,7 +251,7 @@ class ServerTest(unittest.TestCase):
         with patch('medusa.storage.Storage.get_node_backup', return_value=node_backup):
             request = medusa_pb2.BackupStatusRequest(backupName='backup2')
             context = Mock(spec=ServicerContext)
-            backup_status = service.BackupStatus(request, context)
+            backup_status = asyncio.run(service.BackupStatus(request, context))
 
             # we get the response as SUCCESS because the finish time is set (~not None)
             self.assertEqual(medusa_pb2.StatusType.SUCCESS, backup_status.status)